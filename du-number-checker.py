@@ -5,28 +5,46 @@ du_number_checker.py
 Daily du number checker with Telegram alerts.
 
 Flow:
-- Open du prepaid flexi plans page
-- Click "Setup my plan"
-- Click "Change" on the number card
-- Find the search box in the modal
-- For each configured number:
-    - Search for the number
-    - Parse results
+- Launch one headless Chromium instance
+- Spread the configured numbers over up to 4 batches, checked concurrently
+  in one browser context each:
+    - Open du prepaid flexi plans page
+    - Click "Setup my plan"
+    - Click "Change" on the number card
+    - Find the search box in the modal
+    - Search for each number and parse results in one in-page loop
 - If any numbers appear available, send a Telegram alert.
+
+Run with `--serve` to start a long-lived HTTP daemon instead: Chromium is
+launched once and each GET /check runs the flow above against it.
 """
 
+import asyncio
+import json
+import logging
 import os
+import re
 import sys
-import traceback
-from typing import List, Tuple
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
 
-import requests
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+# httpx, playwright and aiohttp are imported inside the functions that use
+# them, so the script starts without paying for the heavy imports up front.
+if TYPE_CHECKING:
+    import httpx
 
 # ---------------- CONFIGURATION ----------------
 
 DU_URL = "https://shop.du.ae/en/personal/s-du-prepaid-flexi-plans"
 
+WHITESPACE = re.compile(r"\s+")
+
+# Candidate selectors for the number picker's results list (first match wins).
+RESULTS_CONTAINER_SELECTOR = "[data-testid='number-results'], .number-picker-results, ul[role='listbox']"
+
 # List of numbers to check.
 # Each tuple is: (what you type in the search box, what you expect to see in the results).
 NUMBERS_TO_CHECK: List[Tuple[str, str]] = [
@@ -35,196 +53,565 @@ NUMBERS_TO_CHECK: List[Tuple[str, str]] = [
     ("6777679", "6777679"),
 ]
 
+
+@dataclass(frozen=True, slots=True)
+class NumberTarget:
+    """A configured number with its whitespace-free fragment precomputed."""
+    search_value: str
+    match_fragment: str
+    normalized_fragment: str
+
+
+NUMBER_TARGETS: Tuple[NumberTarget, ...] = tuple(
+    NumberTarget(s, f, WHITESPACE.sub("", f)) for s, f in NUMBERS_TO_CHECK
+)
+
 # Telegram bot credentials.
 # Recommended: set these as environment variables in your cloud host.
 TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "8534765631:AAHxHvm5ITXuDVncEvdrGx5gBROF3sG7UQ8")
 TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID", "1479175062")
+TELEGRAM_CHUNK_CHARS = 4000  # Telegram rejects messages over 4096 characters
+TELEGRAM_MAX_RETRIES = 3     # Retries per chunk when rate-limited (HTTP 429)
+
+# Log level; set to WARNING in production cron to skip the per-step INFO lines.
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").strip().upper()
 
 # Headless browser config
 HEADLESS = True
 SLOW_MO_MS = 0
+CHROMIUM_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    # Trim background work we never use
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-translate",
+    "--disable-features=site-per-process,TranslateUI,BlinkGenPropertyTrees",
+    "--js-flags=--max-old-space-size=256",
+]
+
+# Concurrency / timing
+MAX_CONCURRENT_CHECKS = 4  # Browser contexts (batches) checked in parallel; each costs ~30 MB RSS
+RESULT_TIMEOUT_MS = 7000   # Max wait for search results to render
+FIRE_ON_ANY = True         # Stop at the first available number (set False for a full sweep)
+UI_TIMEOUT_MS = 15000      # Max wait for page/modal elements to become visible
+
+# Requests that are not needed to drive the number picker are aborted.
+BLOCK_STYLESHEETS = False  # Kept by default: visibility waits depend on the modal's CSS.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"} | ({"stylesheet"} if BLOCK_STYLESHEETS else set()))
+BLOCKED_URL_FRAGMENTS = ("googletagmanager", "google-analytics", "hotjar", "facebook", "doubleclick")
+
+# Browser state (cookies, local storage) saved after the modal flow and reused
+# on later runs, so e.g. the notification popup stays dismissed. The modal
+# itself is opened by clicks and can't be restored from this state.
+STORAGE_STATE_PATH = os.environ.get("DU_STORAGE_STATE_PATH", "du_state.json")
+STORAGE_STATE_TTL_S = 7 * 24 * 3600  # Discard saved state older than a week
+
+# Daemon mode (`--serve`): keep one browser running and check on GET /check.
+SERVER_HOST = os.environ.get("DU_SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.environ.get("DU_SERVER_PORT", "8080"))
+
+
+# ---------------- LOGGING ----------------
+
+log = logging.getLogger(__name__)
+_handler = logging.StreamHandler(sys.stdout)
+_handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+log.addHandler(_handler)
+if LOG_LEVEL in logging.getLevelNamesMapping():
+    log.setLevel(LOG_LEVEL)
+else:
+    # A typo in the environment must not stop the cron run before it checks anything.
+    log.setLevel(logging.INFO)
+    log.warning("Unknown LOG_LEVEL %r; using INFO.", LOG_LEVEL)
 
 
 # ---------------- TELEGRAM UTILS ----------------
 
-def send_telegram_message(text: str) -> None:
-    """Send a Telegram message via bot API."""
+# Shared client so repeated messages reuse one HTTP/2 connection.
+_HTTP_CLIENT: Optional["httpx.AsyncClient"] = None
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Return the shared HTTP client, creating it on first use."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        import httpx
+
+        _HTTP_CLIENT = httpx.AsyncClient(http2=True, timeout=5)
+    return _HTTP_CLIENT
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client if it was created."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
+
+def split_message(text: str, limit: int = TELEGRAM_CHUNK_CHARS) -> List[str]:
+    """Split text into chunks of at most ``limit`` characters, breaking at line boundaries.
+
+    Lines longer than ``limit`` on their own are hard-split.
+    """
+    chunks: List[str] = []
+    current = ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        candidate = line if not current else current + "\n" + line
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def send_telegram_message(text: str) -> None:
+    """Send a Telegram message via bot API.
+
+    Long messages are sent as several chunks. Rate-limited (429) requests are
+    retried after Telegram's ``retry_after`` delay, up to TELEGRAM_MAX_RETRIES times.
+    """
     token = TELEGRAM_BOT_TOKEN
     chat_id = TELEGRAM_CHAT_ID
 
     if not token or not chat_id or "PUT_YOUR" in token or "PUT_YOUR" in chat_id:
-        print("[WARN] Telegram credentials not set; skipping notification.")
+        log.warning("Telegram credentials not set; skipping notification.")
         return
 
     url = f"https://api.telegram.org/bot{token}/sendMessage"
-    try:
-        resp = requests.post(url, data={"chat_id": chat_id, "text": text}, timeout=10)
-        if resp.status_code != 200:
-            print("[ERROR] Failed to send Telegram message:", resp.text)
-        else:
-            print("[INFO] Telegram notification sent.")
-    except Exception as e:
-        print("[ERROR] Exception while sending Telegram message:", repr(e))
+    client = get_http_client()
+    for chunk in split_message(text):
+        for attempt in range(TELEGRAM_MAX_RETRIES + 1):
+            try:
+                resp = await client.post(url, data={"chat_id": chat_id, "text": chunk})
+            except Exception as e:
+                log.error("Exception while sending Telegram message: %r", e)
+                break
+
+            if resp.status_code == 200:
+                log.info("Telegram notification sent.")
+                break
+            if resp.status_code == 429 and attempt < TELEGRAM_MAX_RETRIES:
+                try:
+                    retry_after = resp.json().get("parameters", {}).get("retry_after", 1)
+                except ValueError:
+                    retry_after = 1
+                log.warning("Telegram rate limit hit; retrying in %s s.", retry_after)
+                await asyncio.sleep(retry_after)
+                continue
+            log.error("Failed to send Telegram message: %s", resp.text)
+            break
 
 
 # ---------------- PLAYWRIGHT HELPERS ----------------
 
-def get_search_box(page):
-    """Try several strategies to locate the search box in the modal."""
-    # 1) Try placeholder-based (if present)
-    try:
-        loc = page.get_by_placeholder("Search for a number")
-        if loc.count() > 0:
-            print("[DEBUG] Found search box via placeholder.")
-            return loc.first
-    except Exception:
-        pass
+# Runs every search in the batch inside the renderer in one round-trip.
+# For each [search_value, normalized_fragment] pair it sets the input value
+# through the native setter (so framework-controlled inputs see the change),
+# submits with Enter, and waits on a MutationObserver for an outcome in the
+# whitespace-stripped results list (or the body if the list can't be found).
+# Any outcome marker already on screen from the previous search must go away
+# first (its "No results found" node is detached, or the text no longer shows
+# a marker), so unrelated mutations can't settle the wait on stale results.
+# A search that never gets there is reported as 'ambiguous'. With
+# stopOnMatch the loop ends after the first match, so the result list may be
+# shorter than the batch.
+BATCH_SEARCH_JS = """async (box, [items, selector, timeoutMs, stopOnMatch]) => {
+    const setValue = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+    const resultsRoot = () => document.querySelector(selector) || document.body;
+    const resultsText = () => (resultsRoot().textContent || '').replace(/\\s+/g, '');
+    const hasMarker = (text, fragment) => text.includes('Noresultsfound') || text.includes(fragment);
+    const noResultsNode = () => {
+        const walker = document.createTreeWalker(resultsRoot(), NodeFilter.SHOW_TEXT);
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            if (node.data.replace(/\\s+/g, '').includes('Noresultsfound')) {
+                return node;
+            }
+        }
+        return null;
+    };
+    const submit = (value) => {
+        box.focus();
+        setValue.call(box, '');
+        box.dispatchEvent(new Event('input', {bubbles: true}));
+        setValue.call(box, value);
+        box.dispatchEvent(new Event('input', {bubbles: true}));
+        box.dispatchEvent(new Event('change', {bubbles: true}));
+        const enter = (type) => box.dispatchEvent(new KeyboardEvent(type, {
+            key: 'Enter', code: 'Enter', keyCode: 13, which: 13, bubbles: true, cancelable: true,
+        }));
+        // Synthetic key events don't trigger the browser's implicit form
+        // submission, so submit the form ourselves unless a handler took over.
+        const notHandled = enter('keydown') && enter('keypress');
+        if (notHandled && box.form) {
+            box.form.requestSubmit();
+        }
+        enter('keyup');
+    };
+    const waitForResults = (fragment) => new Promise(resolve => {
+        let timer;
+        // Snapshot what the previous search left behind before submitting.
+        const staleNode = noResultsNode();
+        let cleared = !hasMarker(resultsText(), fragment);
+        const observer = new MutationObserver(() => {
+            const text = resultsText();
+            cleared = cleared || !hasMarker(text, fragment) || (staleNode !== null && !staleNode.isConnected);
+            if (cleared && hasMarker(text, fragment)) {
+                observer.disconnect();
+                clearTimeout(timer);
+                resolve(true);
+            }
+        });
+        observer.observe(document.body, {subtree: true, childList: true, characterData: true});
+        timer = setTimeout(() => { observer.disconnect(); resolve(false); }, timeoutMs);
+    });
+
+    const out = [];
+    for (const [value, fragment] of items) {
+        // Observe before submitting so only mutations caused by this search count.
+        const settled = waitForResults(fragment);
+        submit(value);
+        const rendered = await settled;
+        let status = 'ambiguous';
+        if (rendered) {
+            const text = resultsText();
+            if (text.includes('Noresultsfound')) {
+                status = 'none';
+            } else if (text.includes(fragment)) {
+                status = 'match';
+            }
+        }
+        out.push({rendered, status});
+        if (stopOnMatch && status === 'match') {
+            break;
+        }
+    }
+    return out;
+}"""
+
+
+async def block_unneeded_requests(route) -> None:
+    """Abort images, fonts, media and third-party trackers; let everything else through."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(h in request.url for h in BLOCKED_URL_FRAGMENTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# Search box selectors, most specific first: placeholder, role/name, then any
+# text/search input. The first two match like get_by_placeholder and
+# get_by_role do (substring, case-insensitive, accessible name). All of them
+# only match visible elements; visibility is filtered browser-side.
+_SEARCH_BOX_SELECTORS = [
+    '[placeholder*="Search for a number" i] >> visible=true',
+    "role=textbox[name=/Search for a number/i] >> visible=true",
+    "input[type=search] >> visible=true",
+    "input[type=text] >> visible=true",
+]
 
-    # 2) Try role/name
-    try:
-        loc = page.get_by_role("textbox", name="Search for a number")
-        if loc.count() > 0:
-            print("[DEBUG] Found search box via role/name.")
-            return loc.first
-    except Exception:
-        pass
+# Resolved search box handles, keyed by id(page). Entries are evicted when the page closes.
+_SEARCH_BOX_CACHE: Dict[int, Any] = {}
 
-    # 3) Fallback: any visible text/search input in the modal
-    print("[DEBUG] Falling back to visible text/search input detection...")
-    candidates = page.locator("input[type='text'], input[type='search']")
-    count = candidates.count()
-    print("[DEBUG] Found {} candidate input(s).".format(count))
 
-    for i in range(count):
-        el = candidates.nth(i)
-        try:
-            if el.is_visible():
-                print("[DEBUG] Using visible input candidate #{}".format(i))
-                return el
-        except Exception:
-            continue
+async def get_search_box(page):
+    """Locate the search box in the modal and return it as an ElementHandle.
+
+    Each selector is resolved straight to an ElementHandle with query_selector,
+    stopping at the first hit. The handle is cached per page so repeated calls
+    skip the selector queries.
+    """
+    cached = _SEARCH_BOX_CACHE.get(id(page))
+    if cached is not None:
+        return cached
+
+    handle = None
+    for selector in _SEARCH_BOX_SELECTORS:
+        handle = await page.query_selector(selector)
+        if handle is not None:
+            log.debug("Found search box via %s", selector)
+            break
+    else:
+        log.debug("No search box candidates matched.")
+
+    if handle is not None:
+        page_id = id(page)
+        _SEARCH_BOX_CACHE[page_id] = handle
+        page.once("close", lambda _: _SEARCH_BOX_CACHE.pop(page_id, None))
 
-    return None
+    return handle
 
 
-def open_du_number_modal(page):
+async def open_du_number_modal(page):
     """Navigate to the du page, close any popup, click Setup my plan and Change."""
-    print("[INFO] Opening du page...")
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    log.info("Opening du page...")
     try:
-        page.goto(DU_URL, wait_until="domcontentloaded", timeout=30000)
+        await page.goto(DU_URL, wait_until="domcontentloaded", timeout=30000)
     except PlaywrightTimeoutError:
-        print("[WARN] Page load timeout, continuing anyway (URL: {})".format(page.url))
-    page.wait_for_timeout(3000)
+        log.warning("Page load timeout, continuing anyway (URL: %s)", page.url)
+    setup_btn = page.get_by_text("Setup my plan", exact=False).first
+    await setup_btn.wait_for(state="visible", timeout=UI_TIMEOUT_MS)
 
     # Dismiss notification popup if it appears
     try:
         popup_btn = page.get_by_text("I'll do this later", exact=False)
-        if popup_btn.count() > 0:
-            print("[INFO] Dismissing notification popup...")
-            popup_btn.first.click()
-            page.wait_for_timeout(500)
+        if await popup_btn.count() > 0:
+            log.info("Dismissing notification popup...")
+            await popup_btn.first.click()
+            await popup_btn.first.wait_for(state="hidden", timeout=2000)
     except Exception:
         pass
 
     # Click "Setup my plan"
-    print("[INFO] Clicking 'Setup my plan'...")
-    page.get_by_text("Setup my plan", exact=False).first.click()
-    page.wait_for_timeout(3000)
+    log.info("Clicking 'Setup my plan'...")
+    await setup_btn.click()
 
-    # Click "Change" on the number card (avoid "Change to du" in header)
-    print("[INFO] Clicking 'Change' on the number card...")
+    # Click "Change" on the number card (avoid "Change to du" in header).
+    # The visibility wait sits inside the try so a missing or hidden exact
+    # match still falls through to the scoped locator.
+    log.info("Clicking 'Change' on the number card...")
     try:
         change_link = page.get_by_text("Change", exact=True).first
-        change_link.click(force=True)
+        await change_link.wait_for(state="visible", timeout=UI_TIMEOUT_MS)
+        await change_link.click(force=True)
     except Exception as e:
-        print("[WARN] Exact 'Change' click failed ({}). Trying scoped locator...".format(e))
+        log.warning("Exact 'Change' click failed (%s). Trying scoped locator...", e)
         try:
             card = page.get_by_text("Your new number", exact=False).first
             change_link = card.locator("xpath=..").get_by_text("Change", exact=False).first
-            change_link.click(force=True)
+            await change_link.click(force=True)
         except Exception as e2:
-            print("[ERROR] Could not click 'Change' on card:", repr(e2))
+            log.error("Could not click 'Change' on card: %r", e2)
             raise
 
-    page.wait_for_timeout(3000)
-    print("[INFO] Number picker modal should now be open.")
+    try:
+        await page.locator(_SEARCH_BOX_SELECTORS[0]).first.wait_for(state="visible", timeout=UI_TIMEOUT_MS)
+        log.info("Number picker modal is open.")
+    except PlaywrightTimeoutError:
+        log.warning("Search placeholder not visible yet; continuing with fallback detection.")
 
 
-# ---------------- CORE CHECK LOGIC ----------------
+def load_storage_state() -> Optional[str]:
+    """Return the saved storage state path if it exists and is within its TTL."""
+    try:
+        age = time.time() - os.path.getmtime(STORAGE_STATE_PATH)
+    except OSError:
+        return None
+    if age > STORAGE_STATE_TTL_S:
+        log.info("Saved browser state is stale; ignoring it.")
+        return None
+    return STORAGE_STATE_PATH
 
-def check_numbers() -> List[Tuple[str, str]]:
-    """Check all numbers and return list of (search_value, match_fragment) that appear available."""
-    available = []
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=HEADLESS,
-            slow_mo=SLOW_MO_MS,
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--no-sandbox",
-                "--disable-setuid-sandbox",
-                "--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            ],
-        )
-        page = browser.new_page()
+def discard_storage_state() -> None:
+    """Delete the saved storage state file, ignoring it if it's already gone."""
+    try:
+        os.remove(STORAGE_STATE_PATH)
+    except OSError:
+        pass
 
-        try:
-            open_du_number_modal(page)
-
-            # Find search box once and reuse it
-            print("[INFO] Locating search input in modal...")
-            search_box = get_search_box(page)
-            if search_box is None:
-                print("[ERROR] Could not find any suitable search input.")
-                browser.close()
-                return available
-
-            # Loop over all numbers
-            for search_value, match_fragment in NUMBERS_TO_CHECK:
-                try:
-                    print("[INFO] Checking number '{}'...".format(search_value))
-                    search_box.click()
-                    search_box.fill(search_value)
-                    search_box.press("Enter")
-
-                    page.wait_for_timeout(5000)
-
-                    body_text = page.text_content("body") or ""
-                    normalized_body = body_text.replace(" ", "")
-                    normalized_fragment = match_fragment.replace(" ", "")
-
-                    if "No results found" in body_text:
-                        print("[INFO] '{}' not available (No results found).".format(search_value))
-                    elif normalized_fragment in normalized_body:
-                        print("[INFO] '{}' appears to be AVAILABLE.".format(match_fragment))
-                        available.append((search_value, match_fragment))
-                    else:
-                        print("[WARN] Ambiguous result for '{}'. Did not see 'No results found' or the exact fragment.".format(search_value))
-                except Exception as e:
-                    print("[ERROR] Error while checking '{}': {}".format(search_value, repr(e)))
-                    traceback.print_exc()
-
-        except Exception as outer:
-            print("[ERROR] Failed during page setup or modal open:", repr(outer))
-            traceback.print_exc()
-        finally:
-            browser.close()
 
-    return available
+async def save_storage_state(ctx) -> None:
+    """Write the context's storage state to STORAGE_STATE_PATH atomically.
 
+    The state goes to a temp file in the same directory that is then moved
+    into place, so readers never see a partial file. Failures are only
+    logged: the check that opened the modal carries on regardless.
+    """
+    tmp_path = None
+    try:
+        state = await ctx.storage_state()
+        directory = os.path.dirname(os.path.abspath(STORAGE_STATE_PATH))
+        with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            json.dump(state, f)
+        os.replace(tmp_path, STORAGE_STATE_PATH)
+    except Exception as e:
+        log.warning("Could not save browser state: %r", e)
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
-# ---------------- ENTRYPOINT ----------------
 
-def main():
-    print("[INFO] Starting du number check...")
+# ---------------- CORE CHECK LOGIC ----------------
+
+async def check_batch(
+    ctx,
+    batch: Sequence[NumberTarget],
+    stop_on_match: bool = False,
+    save_state: bool = False,
+) -> List[Tuple[NumberTarget, bool]]:
+    """Open the number picker in its own page and search for every number in ``batch``.
+
+    All searches run inside a single in-renderer loop, so the batch costs one
+    CDP round-trip regardless of its size. With ``save_state`` the context's
+    state is persisted for later runs once the modal is open. With
+    ``stop_on_match`` the loop ends at the first available number and the
+    rest of the batch is skipped.
+    Returns (target, appears_available) for each target that was searched.
+    """
+    page = await ctx.new_page()
+    await open_du_number_modal(page)
+    if save_state:
+        await save_storage_state(ctx)
+
+    log.info("Locating search input in modal...")
+    search_box = await get_search_box(page)
+    if search_box is None:
+        log.error("Could not find any suitable search input for %s.", [t.search_value for t in batch])
+        return [(target, False) for target in batch]
+
+    log.info("Checking numbers %s...", [t.search_value for t in batch])
+    items = [[target.search_value, target.normalized_fragment] for target in batch]
+    results = await search_box.evaluate(
+        BATCH_SEARCH_JS, [items, RESULTS_CONTAINER_SELECTOR, RESULT_TIMEOUT_MS, stop_on_match]
+    )
+
+    outcomes = []
+    for target, result in zip(batch, results):
+        if not result["rendered"]:
+            log.warning("Timed out waiting for results for '%s'.", target.search_value)
+
+        if result["status"] == "none":
+            log.info("'%s' not available (No results found).", target.search_value)
+        elif result["status"] == "match":
+            log.info("'%s' appears to be AVAILABLE.", target.match_fragment)
+        else:
+            log.warning("Ambiguous result for '%s'. Did not see 'No results found' or the exact fragment.", target.search_value)
+        outcomes.append((target, result["status"] == "match"))
+
+    if len(results) < len(batch):
+        log.info("Skipped %s after finding an available number.", [t.search_value for t in batch[len(results):]])
+    return outcomes
+
+
+def split_into_batches(targets: Sequence[NumberTarget], n_batches: int) -> List[Sequence[NumberTarget]]:
+    """Split targets into at most ``n_batches`` contiguous batches of near-equal size."""
+    n_batches = max(1, min(n_batches, len(targets)))
+    size, extra = divmod(len(targets), n_batches)
+    batches = []
+    start = 0
+    for i in range(n_batches):
+        end = start + size + (1 if i < extra else 0)
+        batches.append(targets[start:end])
+        start = end
+    return [batch for batch in batches if batch]
+
+
+@asynccontextmanager
+async def checker_context(browser):
+    """Yield a fresh context for one worker and close it afterwards.
+
+    Contexts share the browser process but keep cookies and storage isolated,
+    so concurrent modal flows don't interfere. Saved storage state is loaded
+    when fresh, and asset/tracker blocking is applied to every page.
+    """
+    storage_state = load_storage_state()
+    try:
+        ctx = await browser.new_context(storage_state=storage_state)
+    except Exception as e:
+        if storage_state is None:
+            raise
+        # A truncated or otherwise unreadable state file must not disable the
+        # checker until the TTL runs out: drop it and start from scratch.
+        log.warning("Could not load saved browser state (%r); discarding it.", e)
+        discard_storage_state()
+        storage_state = None
+        ctx = await browser.new_context()
+    try:
+        await ctx.route("**/*", block_unneeded_requests)
+        yield ctx
+    finally:
+        await ctx.close()
+
+
+async def launch_browser(p):
+    """Launch the shared headless Chromium instance."""
+    return await p.chromium.launch(
+        headless=HEADLESS,
+        slow_mo=SLOW_MO_MS,
+        args=CHROMIUM_ARGS,
+    )
+
+
+async def check_numbers(browser=None, early_exit_on_first_hit: bool = FIRE_ON_ANY) -> List[Tuple[str, str]]:
+    """Check all numbers and return list of (search_value, match_fragment) that appear available.
+
+    Numbers are spread over up to MAX_CONCURRENT_CHECKS batches, so every
+    worker gets at least one; batches are checked concurrently, each in its
+    own BrowserContext, all sharing a single Chromium instance. If ``browser``
+    is None one is launched for this call and closed afterwards; otherwise
+    the caller's browser is reused. With ``early_exit_on_first_hit`` each
+    batch stops at its first hit and the other batches are cancelled.
+    """
+    if browser is None:
+        from playwright.async_api import async_playwright
+
+        async with async_playwright() as p:
+            browser = await launch_browser(p)
+            try:
+                return await check_numbers(browser, early_exit_on_first_hit)
+            finally:
+                await browser.close()
 
-    available = check_numbers()
+    available = []
+    sem = asyncio.Semaphore(MAX_CONCURRENT_CHECKS)
+
+    async def worker(batch: Sequence[NumberTarget], save_state: bool) -> List[Tuple[NumberTarget, bool]]:
+        async with sem:
+            try:
+                async with checker_context(browser) as ctx:
+                    return await check_batch(
+                        ctx, batch, stop_on_match=early_exit_on_first_hit, save_state=save_state
+                    )
+            except Exception:
+                log.exception("Error while checking %s", [t.search_value for t in batch])
+                return [(target, False) for target in batch]
+
+    batches = split_into_batches(NUMBER_TARGETS, MAX_CONCURRENT_CHECKS)
+    # Only the first worker saves browser state, so it is written once per run.
+    tasks = [asyncio.create_task(worker(batch, save_state=(i == 0))) for i, batch in enumerate(batches)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            hits = [target for target, is_available in await next_done if is_available]
+            available.extend((target.search_value, target.match_fragment) for target in hits)
+            if hits and early_exit_on_first_hit:
+                log.info("Found an available number; skipping remaining checks.")
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return available
+
+
+async def run_check_and_alert(browser=None) -> List[Tuple[str, str]]:
+    """Run one full check and send a Telegram alert if anything is available."""
+    log.info("Starting du number check...")
+
+    available = await check_numbers(browser)
 
     if not available:
-        print("[INFO] No numbers available today.")
-        return
+        log.info("No numbers available today.")
+        return available
 
     # Build a single message listing all available numbers
     lines = ["The following numbers appear to be available on du:"]
@@ -232,8 +619,99 @@ def main():
         lines.append("- {}".format(match_fragment))
 
     message = "\n".join(lines)
-    print("[INFO] At least one number appears available. Sending Telegram alert...")
-    send_telegram_message(message)
+    log.info("At least one number appears available. Sending Telegram alert...")
+    await send_telegram_message(message)
+    return available
+
+
+# ---------------- DAEMON MODE ----------------
+
+@dataclass
+class DaemonState:
+    """Mutable per-daemon state, stored once on the aiohttp app before it starts."""
+    playwright: Any = None
+    browser: Any = None
+    check_lock: Optional[asyncio.Lock] = None
+
+
+def serve(host: str = SERVER_HOST, port: int = SERVER_PORT) -> None:
+    """Run a small HTTP daemon that keeps Chromium warm and checks on GET /check.
+
+    Chromium is launched once at startup and shared by all requests; each
+    check still gets fresh browser contexts. Overlapping requests are run one
+    at a time. If Chromium has crashed or disconnected it is relaunched; a
+    sweep during which the browser went away returns 503 instead of an empty
+    result. Point cron/systemd at ``curl -f localhost:<port>/check`` instead
+    of running the script.
+    """
+    from aiohttp import web
+    from playwright.async_api import async_playwright
+
+    # The app is frozen once it starts, so the browser is swapped inside this
+    # holder rather than by reassigning app keys.
+    state_key = web.AppKey("daemon_state", DaemonState)
+
+    async def ensure_browser(state: DaemonState):
+        if state.browser is not None and state.browser.is_connected():
+            return state.browser
+        if state.browser is not None:
+            log.warning("Browser disconnected; relaunching.")
+        state.browser = await launch_browser(state.playwright)
+        return state.browser
+
+    async def browser_lifecycle(app):
+        state = app[state_key]
+        state.check_lock = asyncio.Lock()
+        state.playwright = await async_playwright().start()
+        try:
+            await ensure_browser(state)
+            log.info("Browser launched; serving on %s:%s", host, port)
+            yield
+        finally:
+            if state.browser is not None and state.browser.is_connected():
+                await state.browser.close()
+            await state.playwright.stop()
+            await close_http_client()
+
+    async def handle_check(request):
+        state = request.app[state_key]
+        async with state.check_lock:
+            try:
+                browser = await ensure_browser(state)
+            except Exception:
+                log.exception("Could not launch browser")
+                return web.json_response({"error": "browser unavailable"}, status=503)
+
+            available = await run_check_and_alert(browser)
+
+            # Workers log and swallow per-batch errors, so a browser that died
+            # mid-sweep would otherwise look like "nothing available".
+            if not browser.is_connected():
+                log.error("Browser disconnected during check; result is unreliable.")
+                return web.json_response({"error": "browser disconnected during check"}, status=503)
+        return web.json_response({"available": [fragment for _, fragment in available]})
+
+    app = web.Application()
+    app[state_key] = DaemonState()
+    app.router.add_get("/check", handle_check)
+    app.cleanup_ctx.append(browser_lifecycle)
+    web.run_app(app, host=host, port=port, print=None)
+
+
+# ---------------- ENTRYPOINT ----------------
+
+async def main_async():
+    try:
+        await run_check_and_alert()
+    finally:
+        await close_http_client()
+
+
+def main():
+    if "--serve" in sys.argv[1:]:
+        serve()
+    else:
+        asyncio.run(main_async())
 
 
 if __name__ == "__main__":